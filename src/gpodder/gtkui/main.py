@@ -700,8 +700,7 @@ class gPodder(BuilderWidget, dbus.service.Object):
         selection = self.treeChannels.get_selection()
 
         def select_function(selection, model, path, path_currently_selected):
-            url = model.get_value(model.get_iter(path), PodcastListModel.C_URL)
-            return (url != '-')
+            return not model.get_value(model.get_iter(path), PodcastListModel.C_IS_SECTION)
         selection.set_select_function(select_function)  # full=True)
 
         # Set up type-ahead find for the podcast list
@@ -733,7 +732,7 @@ class gPodder(BuilderWidget, dbus.service.Object):
                         # Already at the end of the list
                         return True
 
-                    if model.get_value(it, PodcastListModel.C_URL) != '-':
+                    if not model.get_value(it, PodcastListModel.C_IS_SECTION):
                         break
 
                 self.treeChannels.set_cursor(path)
@@ -832,6 +831,9 @@ class gPodder(BuilderWidget, dbus.service.Object):
             Gtk.IconTheme.add_builtin_icon(icon_name, cake_size, pixbuf)
 
         self.treeAvailable.set_model(self.episode_list_model.get_filtered_model())
+        # Only refilter the episode list while it is actually displayed
+        self.treeAvailable.connect('map', lambda w: self.episode_list_model.set_active(True))
+        self.treeAvailable.connect('unmap', lambda w: self.episode_list_model.set_active(False))
 
         TreeViewHelper.set(self.treeAvailable, TreeViewHelper.ROLE_EPISODES)
 
@@ -1251,7 +1253,7 @@ class gPodder(BuilderWidget, dbus.service.Object):
                 id = model.get_value(iter, EpisodeListModel.C_URL)
             elif role == TreeViewHelper.ROLE_PODCASTS:
                 id = model.get_value(iter, PodcastListModel.C_URL)
-                if id == '-':
+                if model.get_value(iter, PodcastListModel.C_IS_SECTION):
                     # Section header - no tooltip here (for now at least)
                     return False
 
@@ -2184,7 +2186,7 @@ class gPodder(BuilderWidget, dbus.service.Object):
         model, iter = selection.get_selected()
 
         def is_section(r):
-            return r[PodcastListModel.C_URL] == '-'
+            return r[PodcastListModel.C_IS_SECTION]
 
         def is_separator(r):
             return r[PodcastListModel.C_SEPARATOR]
@@ -23,13 +23,17 @@
 #  Based on code from libpodcasts.py (thp, 2005-10-29)
 #
 
+import collections
+import heapq
 import html
 import logging
 import os
 import re
+import struct
 import time
+from functools import lru_cache
 
-from gi.repository import GdkPixbuf, GObject, Gtk
+from gi.repository import GdkPixbuf, GLib, GObject, Gtk
 
 import gpodder
 from gpodder import coverart, model, query, util
@@ -46,16 +50,110 @@ try:
 except ImportError:
     have_gio = False
 
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Same replacements as html.escape(), but done in a single pass
+_HTML_ESCAPE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+
+
+def _esc(s):
+    return s.translate(_HTML_ESCAPE)
+
+
+@lru_cache(maxsize=64)
+def _compile_eql(term):
+    # Re-use parsed queries while the user is typing or backspacing
+    return query.UserEQL(term)
+
+
+# Themed icon names (from the shared MIME database) for common file types
+_EXT_ICON = {
+    '.mp3': 'audio-mpeg',
+    '.m4a': 'audio-mp4',
+    '.ogg': 'audio-x-vorbis+ogg',
+    '.opus': 'audio-x-opus+ogg',
+    '.flac': 'audio-flac',
+    '.mp4': 'video-mp4',
+    '.mkv': 'video-x-matroska',
+    '.webm': 'video-webm',
+    '.jpg': 'image-jpeg',
+    '.jpeg': 'image-jpeg',
+    '.png': 'image-png',
+}
+
+
+def _iter_rows(model):
+    # Walk the rows of a list model without creating TreeModelRow objects
+    iter = model.get_iter_first()
+    while iter is not None:
+        yield iter
+        iter = model.iter_next(iter)
+
+
+def _aggregate_stats(stats):
+    # Sum up (total, deleted, new, downloaded, unplayed) tuples
+    total = deleted = new = downloaded = unplayed = 0
+    for t, d, n, dl, u in stats:
+        total += t
+        deleted += d
+        new += n
+        downloaded += dl
+        unplayed += u
+    return total, deleted, new, downloaded, unplayed
+
+
+_STATE_DELETED = gpodder.STATE_DELETED
+_STATE_NORMAL = gpodder.STATE_NORMAL
+_STATE_DOWNLOADED = gpodder.STATE_DOWNLOADED
+
 # ----------------------------------------------------------
 
 
 class GEpisode(model.PodcastEpisode):
-    __slots__ = ()
+    __slots__ = ('_format_cache',)
+
+    def _cached_format(self, name, key, func):
+        """Returns func(), cached for as long as key is unchanged"""
+        try:
+            cache = self._format_cache
+        except AttributeError:
+            cache = self._format_cache = {}
+
+        cached = cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        value = func()
+        cache[name] = (key, value)
+        return value
+
+    def cached_pubdate(self):
+        # The result is relative to the current day ("Today", "Yesterday")
+        return self._cached_format('pubdate', (self.published, time.localtime()[:3]),
+                                   self.cute_pubdate)
+
+    def cached_play_info_string(self):
+        return self._cached_format('play_info', (self.total_time, self.current_position),
+                                   self.get_play_info_string)
+
+    def cached_total_time_string(self):
+        return self._cached_format('total_time', self.total_time,
+                                   lambda: util.format_time(self.total_time))
+
+    def cached_filesize_string(self):
+        return self._cached_format('filesize', self.file_size,
+                                   lambda: util.format_filesize(self.file_size, digits=1))
 
     @property
     def title_markup(self):
-        return '%s\n<small>%s</small>' % (html.escape(self.title),
-                          html.escape(self.channel.title))
+        return '%s\n<small>%s</small>' % (_esc(self.title),
+                          _esc(self.channel.title))
 
     @property
     def markup_new_episodes(self):
@@ -65,10 +163,10 @@ class GEpisode(model.PodcastEpisode):
             length_str = ''
         return ('<b>%s</b>\n<small>%s' + _('released %s') +
                 '; ' + _('from %s') + '</small>') % (
-                html.escape(re.sub('\s+', ' ', self.title)),
-                html.escape(length_str),
-                html.escape(self.pubdate_prop),
-                html.escape(re.sub('\s+', ' ', self.channel.title)))
+                _esc(_WHITESPACE_RE.sub(' ', self.title)),
+                _esc(length_str),
+                _esc(self.pubdate_prop),
+                _esc(_WHITESPACE_RE.sub(' ', self.channel.title)))
 
     @property
     def markup_delete_episodes(self):
@@ -83,11 +181,11 @@ class GEpisode(model.PodcastEpisode):
             downloaded_string = _('today')
         return ('<b>%s</b>\n<small>%s; %s; ' + _('downloaded %s') +
                 '; ' + _('from %s') + '</small>') % (
-                html.escape(self.title),
-                html.escape(util.format_filesize(self.file_size)),
-                html.escape(played_string),
-                html.escape(downloaded_string),
-                html.escape(self.channel.title))
+                _esc(self.title),
+                _esc(util.format_filesize(self.file_size)),
+                _esc(played_string),
+                _esc(downloaded_string),
+                _esc(self.channel.title))
 
 
 class GPodcast(model.PodcastChannel):
@@ -109,37 +207,112 @@ class SeparatorMarker(object): pass
 class SectionMarker(object): pass
 
 
+class LruCache(collections.OrderedDict):
+    """A dictionary that drops its least recently used items
+
+    Items are dropped as soon as there are more than maxsize of them.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        collections.OrderedDict.__init__(self)
+
+    def __getitem__(self, key):
+        value = collections.OrderedDict.__getitem__(self, key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        collections.OrderedDict.__setitem__(self, key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
 class BackgroundUpdate(object):
+    # Time budget (in seconds) for processing one chunk of rows
+    TIME_SLICE = 0.02
+
     def __init__(self, model, episodes, include_description):
         self.model = model
-        self.episodes = episodes
+        # Episodes for which new rows are appended to the model
+        self.episodes = collections.deque(episodes)
         self.include_description = include_description
-        self.index = 0
+        # Number of rows processed per call, adapted to the observed cost
+        self._rows_per_tick = 50
+        # Rows that already exist in the model are refreshed in place first
+        # (walked with iter_next), only their volatile columns are updated
+        self.iter = model.get_iter_first()
+
+    def _precompute(self, episodes):
+        """Returns the row values for episodes, without touching the model"""
+        model = self.model
+        include_description = self.include_description
 
-    def update(self):
+        rows = []
+        for episode in episodes:
+            update_values = model.get_update_fields(episode, include_description)[1]
+            rows.append([
+                episode.url,
+                episode.title,
+                episode,
+                episode.cached_pubdate(),
+                episode.published,
+            ] + update_values)
+        return rows
+
+    def _precompute_refresh(self, episodes):
+        """Returns the volatile row values for episodes already in the model"""
         model = self.model
         include_description = self.include_description
 
-        started = time.time()
-        while self.episodes:
-            episode = self.episodes.pop(0)
-            base_fields = (
-                (model.C_URL, episode.url),
-                (model.C_TITLE, episode.title),
-                (model.C_EPISODE, episode),
-                (model.C_PUBLISHED_TEXT, episode.cute_pubdate()),
-                (model.C_PUBLISHED, episode.published),
-            )
-            update_fields = model.get_update_fields(episode, include_description)
-            model.set(model.get_iter((self.index,)), *(x for fields in (base_fields, update_fields)
-                                                       for pair in fields for x in pair))
-            self.index += 1
+        rows = []
+        for episode in episodes:
+            update_values = model.get_update_fields(episode, include_description)[1]
+            rows.append([episode.cached_pubdate()] + update_values)
+        return rows
 
-            # Check for the time limit of 20 ms after each 50 rows processed
-            if self.index % 50 == 0 and (time.time() - started) > 0.02:
-                break
+    def update(self):
+        model = self.model
+
+        started = time.monotonic()
+        count = self._rows_per_tick
+
+        # Format all values of this chunk first, then do the model updates
+        if self.iter is not None:
+            iters = []
+            while self.iter is not None and len(iters) < count:
+                if model.get_value(self.iter, model.C_EPISODE) is not None:
+                    iters.append(self.iter)
+                self.iter = model.iter_next(self.iter)
+
+            columns = [model.C_PUBLISHED_TEXT] + model.UPDATE_COLUMNS
+            episodes = [model.get_value(iter, model.C_EPISODE) for iter in iters]
+            for iter, values in zip(iters, self._precompute_refresh(episodes)):
+                model.set(iter, columns, values)
+            processed = len(iters)
+        else:
+            # append() converts the values to the column types and skips
+            # None cells, and still inserts each row with a single call
+            order = model.ROW_ORDER
+            chunk = [self.episodes.popleft() for i in range(min(count, len(self.episodes)))]
+            for values in self._precompute(chunk):
+                model.append([values[i] for i in order])
+            processed = len(chunk)
 
-        return bool(self.episodes)
+        if processed == count:
+            # Size the next chunk so that it fits into the time slice, but
+            # grow it slowly, as one fast chunk says little about the next
+            elapsed = time.monotonic() - started
+            estimate = int(count * self.TIME_SLICE / max(elapsed, 1e-6))
+            self._rows_per_tick = max(10, min(count * 2, estimate))
+
+        return self.iter is not None or bool(self.episodes)
 
 
 class EpisodeListModel(Gtk.ListStore):
@@ -148,7 +321,20 @@ class EpisodeListModel(Gtk.ListStore):
         C_VIEW_SHOW_UNDELETED, C_VIEW_SHOW_DOWNLOADED, \
         C_VIEW_SHOW_UNPLAYED, C_FILESIZE, C_PUBLISHED, \
         C_TIME, C_TIME_VISIBLE, C_TOTAL_TIME, \
-        C_LOCKED = list(range(17))
+        C_LOCKED, C_VIEW_MASK = list(range(18))
+
+    # Columns set once per row, and columns refreshed by get_update_fields()
+    BASE_COLUMNS = [C_URL, C_TITLE, C_EPISODE, C_PUBLISHED_TEXT, C_PUBLISHED]
+    UPDATE_COLUMNS = [C_STATUS_ICON, C_VIEW_SHOW_UNDELETED,
+                      C_VIEW_SHOW_DOWNLOADED, C_VIEW_SHOW_UNPLAYED,
+                      C_VIEW_MASK, C_DESCRIPTION, C_TOOLTIP, C_TIME,
+                      C_TIME_VISIBLE, C_TOTAL_TIME, C_LOCKED,
+                      C_FILESIZE_TEXT, C_FILESIZE]
+
+    # Index of each column in BASE_COLUMNS + UPDATE_COLUMNS, to put
+    # the values of new rows into column order
+    ROW_ORDER = sorted(range(len(BASE_COLUMNS + UPDATE_COLUMNS)),
+                       key=(BASE_COLUMNS + UPDATE_COLUMNS).__getitem__)
 
     VIEW_ALL, VIEW_UNDELETED, VIEW_DOWNLOADED, VIEW_UNPLAYED = list(range(4))
 
@@ -164,7 +350,7 @@ class EpisodeListModel(Gtk.ListStore):
         Gtk.ListStore.__init__(self, str, str, str, object, str, str, str,
                                str, bool, bool, bool, GObject.TYPE_INT64,
                                GObject.TYPE_INT64, str, bool,
-                               GObject.TYPE_INT64, bool)
+                               GObject.TYPE_INT64, bool, int)
 
         self._config = config
 
@@ -176,10 +362,16 @@ class EpisodeListModel(Gtk.ListStore):
         self._filter = self.filter_new()
         self._sorter = Gtk.TreeModelSort(self._filter)
         self._view_mode = self.VIEW_ALL
+        self._view_mask = 1 << self.VIEW_ALL
         self._search_term = None
         self._search_term_eql = None
+        self._search_error_logged = False
         self._filter.set_visible_func(self._filter_visible_func)
 
+        # Refiltering is deferred while the filtered model is not displayed
+        self._active = True
+        self._refilter_pending = False
+
         # Are we currently showing the "all episodes" view?
         self._all_episodes_view = False
 
@@ -199,9 +391,32 @@ class EpisodeListModel(Gtk.ListStore):
             #     http://gpodder.org/bug/553
             self.ICON_DELETED = 'archive-remove'
 
+        self._icon_theme = Gtk.IconTheme.get_default()
+        self._gio_query_flags = Gio.FileQueryInfoFlags.NONE if have_gio else None
+
+        # Themed icon names for downloaded files, keyed by file extension
+        self._ext_icon_cache = {}
+
+        # Translated tooltip strings used by get_update_fields()
+        self._t_downloading = _('Downloading')
+        self._t_deleted = _('Deleted')
+        self._t_new_episode = _('New episode')
+        self._t_downloaded_episode = _('Downloaded episode')
+        self._t_downloaded_video_episode = _('Downloaded video episode')
+        self._t_downloaded_image = _('Downloaded image')
+        self._t_downloaded_file = _('Downloaded file')
+        self._t_missing_file = _('missing file')
+        self._t_never_displayed = _('never displayed')
+        self._t_never_played = _('never played')
+        self._t_never_opened = _('never opened')
+        self._t_displayed = _('displayed')
+        self._t_played = _('played')
+        self._t_opened = _('opened')
+        self._t_deletion_prevented = _('deletion prevented')
+
     def _format_filesize(self, episode):
         if episode.file_size > 0:
-            return util.format_filesize(episode.file_size, digits=1)
+            return episode.cached_filesize_string()
         else:
             return None
 
@@ -215,18 +430,14 @@ class EpisodeListModel(Gtk.ListStore):
             try:
                 return self._search_term_eql.match(episode)
             except Exception as e:
+                # Only log the first failure, this is called for every row
+                if not self._search_error_logged:
+                    logger.warn('Cannot match search term: %s', self._search_term, exc_info=True)
+                    self._search_error_logged = True
                 return True
 
-        if self._view_mode == self.VIEW_ALL:
-            return True
-        elif self._view_mode == self.VIEW_UNDELETED:
-            return model.get_value(iter, self.C_VIEW_SHOW_UNDELETED)
-        elif self._view_mode == self.VIEW_DOWNLOADED:
-            return model.get_value(iter, self.C_VIEW_SHOW_DOWNLOADED)
-        elif self._view_mode == self.VIEW_UNPLAYED:
-            return model.get_value(iter, self.C_VIEW_SHOW_UNPLAYED)
-
-        return True
+        # C_VIEW_MASK has one bit set for each view mode showing this row
+        return bool(model.get_value(iter, self.C_VIEW_MASK) & self._view_mask)
 
     def get_filtered_model(self):
         """Returns a filtered version of this episode model
@@ -237,13 +448,32 @@ class EpisodeListModel(Gtk.ListStore):
         """
         return self._sorter
 
+    def set_active(self, active):
+        """Tells the model whether its filtered model is displayed
+
+        While inactive, changes to the view mode or search term
+        do not refilter the model; the refiltering is done once
+        the model becomes active again.
+        """
+        self._active = active
+        if active and self._refilter_pending:
+            self._refilter()
+
+    def _refilter(self):
+        if self._active:
+            self._refilter_pending = False
+            self._filter.refilter()
+            self._on_filter_changed(self.has_episodes())
+        else:
+            self._refilter_pending = True
+
     def has_episodes(self):
         """Returns True if episodes are visible (filtered)
 
         If episodes are visible with the current filter
         applied, return True (otherwise return False).
         """
-        return bool(len(self._filter))
+        return self._filter.get_iter_first() is not None
 
     def set_view_mode(self, new_mode):
         """Sets a new view mode for this model
@@ -252,8 +482,8 @@ class EpisodeListModel(Gtk.ListStore):
         might be updated to reflect the new mode."""
         if self._view_mode != new_mode:
             self._view_mode = new_mode
-            self._filter.refilter()
-            self._on_filter_changed(self.has_episodes())
+            self._view_mask = 1 << new_mode
+            self._refilter()
 
     def get_view_mode(self):
         """Returns the currently-set view mode"""
@@ -262,9 +492,9 @@ class EpisodeListModel(Gtk.ListStore):
     def set_search_term(self, new_term):
         if self._search_term != new_term:
             self._search_term = new_term
-            self._search_term_eql = query.UserEQL(new_term)
-            self._filter.refilter()
-            self._on_filter_changed(self.has_episodes())
+            self._search_term_eql = _compile_eql(new_term)
+            self._search_error_logged = False
+            self._refilter()
 
     def get_search_term(self):
         return self._search_term
@@ -274,20 +504,20 @@ class EpisodeListModel(Gtk.ListStore):
 
         if episode.state != gpodder.STATE_DELETED and episode.is_new:
             yield '<b>'
-            yield html.escape(title)
+            yield _esc(title)
             yield '</b>'
         else:
-            yield html.escape(title)
+            yield _esc(title)
 
         if include_description:
             yield '\n'
             if self._all_episodes_view:
-                yield _('from %s') % html.escape(episode.channel.title)
+                yield _('from %s') % _esc(episode.channel.title)
             else:
                 description = episode.one_line_description()
                 if description.startswith(title):
                     description = description[len(title):].strip()
-                yield html.escape(description)
+                yield _esc(description)
 
     def replace_from_channel(self, channel, include_description=False):
         """
@@ -311,9 +541,6 @@ class EpisodeListModel(Gtk.ListStore):
         # Always make a copy, so we can pass the episode list to BackgroundUpdate
         episodes = list(episodes)
 
-        for _ in range(len(episodes)):
-            self.append()
-
         self._update_from_episodes(episodes, include_description)
 
     def _update_from_episodes(self, episodes, include_description):
@@ -335,20 +562,19 @@ class EpisodeListModel(Gtk.ListStore):
         return False
 
     def update_all(self, include_description=False):
+        # Rows already in the model are refreshed in place, and episodes
+        # that have not been added yet (if any) are still appended
         if self.background_update is None:
-            episodes = [row[self.C_EPISODE] for row in self]
+            episodes = []
         else:
-            # Update all episodes that have already been initialized...
-            episodes = [row[self.C_EPISODE] for index, row in enumerate(self) if index < self.background_update.index]
-            # ...and also include episodes that still need to be initialized
-            episodes.extend(self.background_update.episodes)
+            episodes = self.background_update.episodes
 
         self._update_from_episodes(episodes, include_description)
 
     def update_by_urls(self, urls, include_description=False):
-        for row in self:
-            if row[self.C_URL] in urls:
-                self.update_by_iter(row.iter, include_description)
+        for iter in _iter_rows(self):
+            if self.get_value(iter, self.C_URL) in urls:
+                self.update_by_iter(iter, include_description)
 
     def update_by_filter_iter(self, iter, include_description=False):
         # Convenience function for use by "outside" methods that use iters
@@ -366,10 +592,10 @@ class EpisodeListModel(Gtk.ListStore):
         view_show_undeleted = True
         view_show_downloaded = False
         view_show_unplayed = False
-        icon_theme = Gtk.IconTheme.get_default()
+        icon_theme = self._icon_theme
 
         if episode.downloading:
-            tooltip.append('%s %d%%' % (_('Downloading'),
+            tooltip.append('%s %d%%' % (self._t_downloading,
                 int(episode.download_task.progress * 100)))
 
             index = int(self.PROGRESS_STEPS * episode.download_task.progress)
@@ -378,101 +604,126 @@ class EpisodeListModel(Gtk.ListStore):
             view_show_downloaded = True
             view_show_unplayed = True
         else:
-            if episode.state == gpodder.STATE_DELETED:
-                tooltip.append(_('Deleted'))
+            if episode.state == _STATE_DELETED:
+                tooltip.append(self._t_deleted)
                 status_icon = self.ICON_DELETED
                 view_show_undeleted = False
-            elif episode.state == gpodder.STATE_NORMAL and \
+            elif episode.state == _STATE_NORMAL and \
                     episode.is_new:
-                tooltip.append(_('New episode'))
+                tooltip.append(self._t_new_episode)
                 view_show_downloaded = True
                 view_show_unplayed = True
-            elif episode.state == gpodder.STATE_DOWNLOADED:
+            elif episode.state == _STATE_DOWNLOADED:
                 tooltip = []
                 view_show_downloaded = True
                 view_show_unplayed = episode.is_new
                 show_bullet = episode.is_new
                 show_padlock = episode.archive
-                show_missing = not episode.file_exists()
+                # Check for the file only once, see PodcastEpisode.file_exists()
                 filename = episode.local_filename(create=False, check_only=True)
+                file_exists = filename is not None and os.path.exists(filename)
+                show_missing = not file_exists
 
                 file_type = episode.file_type()
                 if file_type == 'audio':
-                    tooltip.append(_('Downloaded episode'))
+                    tooltip.append(self._t_downloaded_episode)
                     status_icon = self.ICON_AUDIO_FILE
                 elif file_type == 'video':
-                    tooltip.append(_('Downloaded video episode'))
+                    tooltip.append(self._t_downloaded_video_episode)
                     status_icon = self.ICON_VIDEO_FILE
                 elif file_type == 'image':
-                    tooltip.append(_('Downloaded image'))
+                    tooltip.append(self._t_downloaded_image)
                     status_icon = self.ICON_IMAGE_FILE
                 else:
-                    tooltip.append(_('Downloaded file'))
+                    tooltip.append(self._t_downloaded_file)
                     status_icon = self.ICON_GENERIC_FILE
 
                 # Try to find a themed icon for this file
                 # doesn't work on win32 (opus files are showed as text)
-                if filename is not None and have_gio and not gpodder.ui.win32:
-                    file = Gio.File.new_for_path(filename)
-                    if file.query_exists():
-                        file_info = file.query_info('*', Gio.FileQueryInfoFlags.NONE, None)
-                        icon = file_info.get_icon()
-                        for icon_name in icon.get_names():
-                            if icon_theme.has_icon(icon_name):
-                                status_icon = icon_name
-                                break
+                if file_exists and not gpodder.ui.win32:
+                    ext = os.path.splitext(filename)[1].lower()
+                    mapped_icon = _EXT_ICON.get(ext)
+                    if ext in self._ext_icon_cache:
+                        status_icon = self._ext_icon_cache[ext] or status_icon
+                    elif mapped_icon is not None and icon_theme.has_icon(mapped_icon):
+                        # Common podcast file types don't need a Gio lookup
+                        self._ext_icon_cache[ext] = mapped_icon
+                        status_icon = mapped_icon
+                    elif have_gio:
+                        file = Gio.File.new_for_path(filename)
+                        try:
+                            file_info = file.query_info('standard::icon', self._gio_query_flags, None)
+                        except GLib.Error:
+                            # File does not exist (or cannot be queried)
+                            file_info = None
+
+                        if file_info is not None:
+                            themed_icon = None
+                            for icon_name in file_info.get_icon().get_names():
+                                if icon_theme.has_icon(icon_name):
+                                    themed_icon = icon_name
+                                    break
+                            self._ext_icon_cache[ext] = themed_icon
+                            status_icon = themed_icon or status_icon
 
                 if show_missing:
-                    tooltip.append(_('missing file'))
+                    tooltip.append(self._t_missing_file)
                 else:
                     if show_bullet:
                         if file_type == 'image':
-                            tooltip.append(_('never displayed'))
+                            tooltip.append(self._t_never_displayed)
                         elif file_type in ('audio', 'video'):
-                            tooltip.append(_('never played'))
+                            tooltip.append(self._t_never_played)
                         else:
-                            tooltip.append(_('never opened'))
+                            tooltip.append(self._t_never_opened)
                     else:
                         if file_type == 'image':
-                            tooltip.append(_('displayed'))
+                            tooltip.append(self._t_displayed)
                         elif file_type in ('audio', 'video'):
-                            tooltip.append(_('played'))
+                            tooltip.append(self._t_played)
                         else:
-                            tooltip.append(_('opened'))
+                            tooltip.append(self._t_opened)
                     if show_padlock:
-                        tooltip.append(_('deletion prevented'))
+                        tooltip.append(self._t_deletion_prevented)
 
                 if episode.total_time > 0 and episode.current_position:
                     tooltip.append('%d%%' % (100. * float(episode.current_position) /
                                              float(episode.total_time),))
 
         if episode.total_time:
-            total_time = util.format_time(episode.total_time)
+            total_time = episode.cached_total_time_string()
             if total_time:
                 tooltip.append(total_time)
 
         tooltip = ', '.join(tooltip)
 
+        view_mask = ((1 << self.VIEW_ALL) |
+                     (view_show_undeleted << self.VIEW_UNDELETED) |
+                     (view_show_downloaded << self.VIEW_DOWNLOADED) |
+                     (view_show_unplayed << self.VIEW_UNPLAYED))
+
         description = ''.join(self._format_description(episode, include_description))
-        return (
-                (self.C_STATUS_ICON, status_icon),
-                (self.C_VIEW_SHOW_UNDELETED, view_show_undeleted),
-                (self.C_VIEW_SHOW_DOWNLOADED, view_show_downloaded),
-                (self.C_VIEW_SHOW_UNPLAYED, view_show_unplayed),
-                (self.C_DESCRIPTION, description),
-                (self.C_TOOLTIP, tooltip),
-                (self.C_TIME, episode.get_play_info_string()),
-                (self.C_TIME_VISIBLE, bool(episode.total_time)),
-                (self.C_TOTAL_TIME, episode.total_time),
-                (self.C_LOCKED, episode.archive),
-                (self.C_FILESIZE_TEXT, self._format_filesize(episode)),
-                (self.C_FILESIZE, episode.file_size),
-        )
+        # Values in the same order as UPDATE_COLUMNS
+        return self.UPDATE_COLUMNS, [
+                status_icon,
+                view_show_undeleted,
+                view_show_downloaded,
+                view_show_unplayed,
+                view_mask,
+                description,
+                tooltip,
+                episode.cached_play_info_string(),
+                bool(episode.total_time),
+                episode.total_time,
+                episode.archive,
+                self._format_filesize(episode),
+                episode.file_size,
+        ]
 
     def update_by_iter(self, iter, include_description=False):
         episode = self.get_value(iter, self.C_EPISODE)
         if episode is not None:
-            self.set(iter, *(x for pair in self.get_update_fields(episode, include_description) for x in pair))
+            self.set(iter, *self.get_update_fields(episode, include_description))
 
 
 class PodcastChannelProxy(object):
@@ -503,8 +754,10 @@ class PodcastChannelProxy(object):
 
     def get_all_episodes(self):
         """Returns a generator that yields every episode"""
-        return Model.sort_episodes_by_pubdate((e for c in self.channels
-                for e in c.get_all_episodes()), True)
+        # Sort the (small) per-channel lists, then merge them
+        per_channel = [Model.sort_episodes_by_pubdate(c.get_all_episodes(), True)
+                       for c in self.channels]
+        return heapq.merge(*per_channel, key=Model.episode_sort_key, reverse=True)
 
     def save(self):
         pass
@@ -515,10 +768,25 @@ class PodcastListModel(Gtk.ListStore):
         C_COVER, C_ERROR, C_PILL_VISIBLE, \
         C_VIEW_SHOW_UNDELETED, C_VIEW_SHOW_DOWNLOADED, \
         C_VIEW_SHOW_UNPLAYED, C_HAS_EPISODES, C_SEPARATOR, \
-        C_DOWNLOADS, C_COVER_VISIBLE, C_SECTION = list(range(16))
+        C_DOWNLOADS, C_COVER_VISIBLE, C_SECTION, \
+        C_SEARCH_HAYSTACK, C_IS_SECTION = list(range(18))
+
+    # Columns updated by update_by_iter() for section headers and podcasts
+    _SECTION_COLS = [C_DESCRIPTION, C_SECTION, C_VIEW_SHOW_UNDELETED,
+                     C_VIEW_SHOW_DOWNLOADED, C_VIEW_SHOW_UNPLAYED]
+    _CHANNEL_COLS = [C_TITLE, C_DESCRIPTION, C_SECTION, C_ERROR, C_PILL,
+                     C_PILL_VISIBLE, C_VIEW_SHOW_UNDELETED,
+                     C_VIEW_SHOW_DOWNLOADED, C_VIEW_SHOW_UNPLAYED,
+                     C_HAS_EPISODES, C_DOWNLOADS, C_SEARCH_HAYSTACK]
 
     SEARCH_COLUMNS = (C_TITLE, C_DESCRIPTION, C_SECTION)
 
+    # Types of objects in C_CHANNEL that are podcast rows
+    _CHANNEL_TYPES = (GPodcast, PodcastChannelProxy)
+
+    # Maximum number of podcasts whose covers are kept in the cover cache
+    COVER_CACHE_SIZE = 256
+
     @classmethod
     def row_separator_func(cls, model, iter):
         return model.get_value(iter, cls.C_SEPARATOR)
@@ -526,28 +794,61 @@ class PodcastListModel(Gtk.ListStore):
     def __init__(self, cover_downloader):
         Gtk.ListStore.__init__(self, str, str, str, GdkPixbuf.Pixbuf,
                 object, GdkPixbuf.Pixbuf, str, bool, bool, bool, bool,
-                bool, bool, int, bool, str)
+                bool, bool, int, bool, str, str, bool)
 
         # Filter to allow hiding some episodes
         self._filter = self.filter_new()
         self._view_mode = -1
         self._search_term = None
+        self._search_key = None
         self._filter.set_visible_func(self._filter_visible_func)
 
-        self._cover_cache = {}
+        # At most two entries per podcast: the thumb, and the
+        # overlaid cover if the podcast is paused
+        self._cover_cache = LruCache(2 * self.COVER_CACHE_SIZE)
         self._max_image_side = 40
         self._cover_downloader = cover_downloader
 
+        # Row references of podcast rows, keyed by URL
+        self._url_to_iter = {}
+
+        # Row references of section headers, and podcasts of each section
+        self._section_rows = {}
+        self._channels_by_section = {}
+        self._channel_sections = {}
+
+        # Podcast statistics, re-used by section headers during a refresh
+        self._stats_cache = {}
+
+        # Section header markup, keyed by section name
+        self._section_desc_cache = {}
+
+        # Inputs of the last update of each podcast row, keyed by URL
+        self._last_sig = {}
+
+        # (inputs, description, error markup) of each podcast row
+        self._fmt_cache = {}
+
+        # Covers are loaded in the background after set_channels()
+        self._pending_covers = collections.deque()
+        self._cover_update_tag = None
+
+        # URLs from update_by_urls(), updated together when idle
+        self._pending_updates = set()
+        self._flush_update_tag = None
+
         self.ICON_DISABLED = 'gtk-media-pause'
 
+        # The tree view displaying this model (set by the main window)
+        self.widget = None
+
     def _filter_visible_func(self, model, iter, misc):
         # If searching is active, set visibility based on search text
         if self._search_term is not None:
-            if model.get_value(iter, self.C_CHANNEL) == SectionMarker:
+            if model.get_value(iter, self.C_IS_SECTION):
                 return True
-            key = self._search_term.lower()
-            columns = (model.get_value(iter, c) for c in self.SEARCH_COLUMNS)
-            return any((key in c.lower() for c in columns if c is not None))
+            haystack = model.get_value(iter, self.C_SEARCH_HAYSTACK)
+            return haystack is not None and self._search_key in haystack
 
         if model.get_value(iter, self.C_SEPARATOR):
             return True
@@ -587,6 +888,7 @@ class PodcastListModel(Gtk.ListStore):
     def set_search_term(self, new_term):
         if self._search_term != new_term:
             self._search_term = new_term
+            self._search_key = new_term.casefold() if new_term is not None else None
             self._filter.refilter()
 
     def get_search_term(self):
@@ -599,8 +901,15 @@ class PodcastListModel(Gtk.ListStore):
         return model.get_value(iter, self.C_SEPARATOR)
 
     def set_max_image_size(self, size):
+        # Cache keys include the size, so covers at the old size
+        # are simply not found anymore and will age out of the LRU
         self._max_image_side = size
-        self._cover_cache = {}
+
+    def _thumb_key(self, url):
+        return (url, self._max_image_side)
+
+    def _overlay_key(self, url):
+        return (url, self._max_image_side, 'paused')
 
     def _resize_pixbuf_keep_ratio(self, url, pixbuf):
         """
@@ -608,37 +917,32 @@ class PodcastListModel(Gtk.ListStore):
         Returns None if the pixbuf does not need to be
         resized or the newly resized pixbuf if it does.
         """
-        changed = False
-        result = None
-
-        if url in self._cover_cache:
-            return self._cover_cache[url]
-
-        # Resize if too wide
-        if pixbuf.get_width() > self._max_image_side:
-            f = float(self._max_image_side) / pixbuf.get_width()
-            (width, height) = (int(pixbuf.get_width() * f), int(pixbuf.get_height() * f))
-            pixbuf = pixbuf.scale_simple(width, height, GdkPixbuf.InterpType.BILINEAR)
-            changed = True
+        key = self._thumb_key(url)
+        if key in self._cover_cache:
+            return self._cover_cache[key]
 
-        # Resize if too high
-        if pixbuf.get_height() > self._max_image_side:
-            f = float(self._max_image_side) / pixbuf.get_height()
-            (width, height) = (int(pixbuf.get_width() * f), int(pixbuf.get_height() * f))
-            pixbuf = pixbuf.scale_simple(width, height, GdkPixbuf.InterpType.BILINEAR)
-            changed = True
-
-        if changed:
-            self._cover_cache[url] = pixbuf
-            result = pixbuf
+        (width, height) = (pixbuf.get_width(), pixbuf.get_height())
+        if width <= self._max_image_side and height <= self._max_image_side:
+            return None
 
-        return result
+        # Scale once, so that the longer side fits
+        f = float(self._max_image_side) / max(width, height)
+        (width, height) = (int(width * f), int(height * f))
+        pixbuf = pixbuf.scale_simple(width, height, GdkPixbuf.InterpType.BILINEAR)
+        self._cover_cache[key] = pixbuf
+        return pixbuf
 
     def _resize_pixbuf(self, url, pixbuf):
         if pixbuf is None:
             return None
 
-        return self._resize_pixbuf_keep_ratio(url, pixbuf) or pixbuf
+        resized = self._resize_pixbuf_keep_ratio(url, pixbuf)
+        if resized is None:
+            # Already small enough, cache it as it is displayed
+            self._cover_cache[self._thumb_key(url)] = pixbuf
+            return pixbuf
+
+        return resized
 
     def _overlay_pixbuf(self, pixbuf, icon):
         try:
@@ -659,10 +963,23 @@ class PodcastListModel(Gtk.ListStore):
 
         return pixbuf
 
+    @staticmethod
+    def _get_thumb_size(data):
+        """Returns (width, height) from the header of PNG data, or None"""
+        if len(data) < 24 or data[:8] != b'\x89PNG\r\n\x1a\n' or data[12:16] != b'IHDR':
+            return None
+        return struct.unpack('>II', data[16:24])
+
     def _get_cached_thumb(self, channel):
         if channel.cover_thumb is None:
             return None
 
+        # Reject thumbs of the wrong size without decoding them
+        size = self._get_thumb_size(channel.cover_thumb)
+        if size is not None and self._max_image_side not in size:
+            logger.debug("cached thumb wrong size: %r != %i", size, self._max_image_side)
+            return None
+
         try:
             loader = GdkPixbuf.PixbufLoader()
             loader.write(channel.cover_thumb)
@@ -677,13 +994,18 @@ class PodcastListModel(Gtk.ListStore):
             channel.save()
             return None
 
+        self._cover_cache[self._thumb_key(channel.url)] = pixbuf
+        return pixbuf
+
     def _save_cached_thumb(self, channel, pixbuf):
         bufs = []
 
         def save_callback(buf, length, user_data):
             user_data.append(buf)
             return True
-        pixbuf.save_to_callbackv(save_callback, bufs, 'png', [None], [])
+        # Thumbs are tiny; store them uncompressed so loading them
+        # on startup is a plain copy instead of an inflate pass
+        pixbuf.save_to_callbackv(save_callback, bufs, 'png', ['compression'], ['0'])
         channel.cover_thumb = bytes(b''.join(bufs))
         channel.save()
 
@@ -691,16 +1013,28 @@ class PodcastListModel(Gtk.ListStore):
         if self._cover_downloader is None:
             return None
 
-        pixbuf_overlay = self._get_cached_thumb(channel)
+        # Overlaid covers are cached separately, without an overlay
+        # the final cover is the cached thumb itself
+        overlay = add_overlay and channel.pause_subscription
+        if overlay:
+            pixbuf_overlay = self._cover_cache.get(self._overlay_key(channel.url))
+            if pixbuf_overlay is not None:
+                return pixbuf_overlay
+
+        pixbuf_overlay = self._cover_cache.get(self._thumb_key(channel.url))
+        if pixbuf_overlay is None:
+            pixbuf_overlay = self._get_cached_thumb(channel)
 
         if pixbuf_overlay is None:
             pixbuf = self._cover_downloader.get_cover(channel, avoid_downloading=True)
             pixbuf_overlay = self._resize_pixbuf(channel.url, pixbuf)
             self._save_cached_thumb(channel, pixbuf_overlay)
 
-        if add_overlay and channel.pause_subscription:
-            pixbuf_overlay = self._overlay_pixbuf(pixbuf_overlay, self.ICON_DISABLED)
+        if overlay and pixbuf_overlay is not None:
+            # Don't modify the cached, non-overlaid pixbuf in place
+            pixbuf_overlay = self._overlay_pixbuf(pixbuf_overlay.copy(), self.ICON_DISABLED)
             pixbuf_overlay.saturate_and_pixelate(pixbuf_overlay, 0.0, False)
+            self._cover_cache[self._overlay_key(channel.url)] = pixbuf_overlay
 
         return pixbuf_overlay
 
@@ -736,24 +1070,65 @@ class PodcastListModel(Gtk.ListStore):
         #     return None
         return None
 
+    def _update_covers(self):
+        started = time.monotonic()
+        while self._pending_covers:
+            iter, channel, add_overlay = self._pending_covers.popleft()
+            self.set_value(iter, self.C_COVER, self._get_cover_image(channel, add_overlay))
+            if time.monotonic() - started > BackgroundUpdate.TIME_SLICE:
+                return True
+
+        self._cover_update_tag = None
+        return False
+
     def set_channels(self, db, config, channels):
         # Clear the model and update the list of podcasts
+        if self._cover_update_tag is not None:
+            GObject.source_remove(self._cover_update_tag)
+            self._cover_update_tag = None
+        self._pending_covers.clear()
+        # All rows are rebuilt anyway
+        self._cancel_pending_updates()
+        self._url_to_iter.clear()
+        self._section_rows.clear()
+        self._channels_by_section.clear()
+        self._channel_sections.clear()
+        self.invalidate_stats()
+        self._section_desc_cache.clear()
+        self._last_sig.clear()
+        self._fmt_cache.clear()
         self.clear()
 
-        def channel_to_row(channel, add_overlay=False):
-            return (channel.url, '', '', None, channel,
-                    self._get_cover_image(channel, add_overlay), '', True,
-                    True, True, True, True, False, 0, True, '')
+        def channel_to_row(channel):
+            # The cover is filled in later by _update_covers()
+            return [channel.url, '', '', None, channel,
+                    None, '', True,
+                    True, True, True, True, False, 0, True, '', '', False]
+
+        def append_channel(channel, add_overlay=False):
+            if isinstance(channel, GPodcast):
+                self._set_channel_section(channel)
+
+            # Insert the row with its final values, so that it only
+            # emits "row-inserted" and no extra "row-changed"
+            row = channel_to_row(channel)
+            for column, value in zip(self._CHANNEL_COLS, self._get_channel_values(channel, force=True)):
+                row[column] = value
+
+            # append() converts the values and skips None cells (such as
+            # the cover), which insert_with_valuesv() would complain about
+            iter = self.append(row)
+            self._url_to_iter[channel.url] = Gtk.TreeRowReference.new(self, self.get_path(iter))
+            self._pending_covers.append((iter, channel, add_overlay))
 
         if config.podcast_list_view_all and channels:
             all_episodes = PodcastChannelProxy(db, config, channels)
-            iter = self.append(channel_to_row(all_episodes))
-            self.update_by_iter(iter)
+            append_channel(all_episodes)
 
             # Separator item
             if not config.podcast_list_sections:
-                self.append(('', '', '', None, SeparatorMarker, None, '',
-                    True, True, True, True, True, True, 0, False, ''))
+                self.append(['', '', '', None, SeparatorMarker, None, '',
+                    True, True, True, True, True, True, 0, False, '', '', False])
 
         def key_func(pair):
             section, podcast = pair
@@ -772,19 +1147,22 @@ class PodcastListModel(Gtk.ListStore):
         old_section = None
         for section, channel in sorted(convert(channels), key=key_func):
             if old_section != section:
-                it = self.append(('-', section, '', None, SectionMarker, None,
-                    '', True, True, True, True, True, False, 0, False, section))
+                it = self.append(['-', section, '', None, SectionMarker, None,
+                    '', True, True, True, True, True, False, 0, False, section, '', True])
+                self._section_rows[section] = Gtk.TreeRowReference.new(self, self.get_path(it))
                 added_sections.append(it)
                 old_section = section
 
-            iter = self.append(channel_to_row(channel, True))
-            self.update_by_iter(iter)
+            append_channel(channel, True)
 
         # Update section header stats only after all podcasts
         # have been added to the list to get the stats right
         for it in added_sections:
             self.update_by_iter(it)
 
+        if self._pending_covers:
+            self._cover_update_tag = GObject.idle_add(self._update_covers)
+
     def get_filter_path_from_url(self, url):
         # Return the path of the filtered model for a given URL
         child_path = self.get_path_from_url(url)
@@ -798,99 +1176,202 @@ class PodcastListModel(Gtk.ListStore):
         if url is None:
             return None
 
-        for row in self:
-            if row[self.C_URL] == url:
-                return row.path
-        return None
+        ref = self._url_to_iter.get(url)
+        if ref is None or not ref.valid():
+            return None
+        return ref.get_path()
+
+    def _get_iter_from_url(self, url):
+        path = self.get_path_from_url(url)
+        if path is None:
+            return None
+        return self.get_iter(path)
 
     def update_first_row(self):
         # Update the first row in the model (for "all episodes" updates)
         self.update_by_iter(self.get_iter_first())
 
     def update_by_urls(self, urls):
-        # Given a list of URLs, update each matching row
-        for row in self:
-            if row[self.C_URL] in urls:
-                self.update_by_iter(row.iter)
+        # Given a list of URLs, update each matching row. Bursts of
+        # calls (e.g. from download progress) are coalesced, so that
+        # every row is updated at most once per idle callback.
+        self._pending_updates.update(urls)
+        if self._pending_updates and self._flush_update_tag is None:
+            self._flush_update_tag = GObject.idle_add(self._flush_updates)
+
+    def _flush_updates(self):
+        self._flush_update_tag = None
+        urls, self._pending_updates = self._pending_updates, set()
+        for url in urls:
+            iter = self._get_iter_from_url(url)
+            if iter is not None:
+                self.update_by_iter(iter)
+
+        # Section headers were possibly updated before the podcasts
+        # they summarize, so refresh them from the new statistics
+        if self._section_rows:
+            self.update_sections()
+        return False
+
+    def _cancel_pending_updates(self):
+        if self._flush_update_tag is not None:
+            GObject.source_remove(self._flush_update_tag)
+            self._flush_update_tag = None
+        self._pending_updates.clear()
 
     def iter_is_first_row(self, iter):
         iter = self._filter.convert_iter_to_child_iter(iter)
-        path = self.get_path(iter)
-        return (path == Gtk.TreePath.new_first())
+        indices = self.get_path(iter).get_indices()
+        return len(indices) == 1 and indices[0] == 0
 
     def update_by_filter_iter(self, iter):
         self.update_by_iter(self._filter.convert_iter_to_child_iter(iter))
 
     def update_all(self):
-        for row in self:
-            self.update_by_iter(row.iter)
+        # Every row is updated now, including the pending ones
+        self._cancel_pending_updates()
+
+        # Section headers come before their podcasts in the model, but
+        # sum up their statistics, so they are updated last
+        for iter in _iter_rows(self):
+            if not self.get_value(iter, self.C_IS_SECTION):
+                self.update_by_iter(iter)
+        self.update_sections()
 
     def update_sections(self):
-        for row in self:
-            if row[self.C_CHANNEL] is SectionMarker:
-                self.update_by_iter(row.iter)
+        for ref in self._section_rows.values():
+            if ref.valid():
+                self.update_by_iter(self.get_iter(ref.get_path()))
+
+    def _set_channel_section(self, channel):
+        # Keep _channels_by_section in sync with the section of a podcast
+        if channel in self._channel_sections:
+            old_section = self._channel_sections[channel]
+            if old_section == channel.section:
+                return
+            self._channels_by_section[old_section].remove(channel)
+
+        self._channels_by_section.setdefault(channel.section, []).append(channel)
+        self._channel_sections[channel] = channel.section
+
+    def _stats(self, channel, refresh=False):
+        if not refresh:
+            stats = self._stats_cache.get(channel.url)
+            if stats is not None:
+                return stats
+
+        stats = channel.get_statistics()
+        self._stats_cache[channel.url] = stats
+        return stats
+
+    def invalidate_stats(self, url=None):
+        """Forget cached statistics of one podcast (or all if url is None)"""
+        if url is None:
+            self._stats_cache.clear()
+        else:
+            self._stats_cache.pop(url, None)
 
     def update_by_iter(self, iter):
         if iter is None:
             return
 
         # Given a GtkTreeIter, update volatile information
-        channel = self.get_value(iter, self.C_CHANNEL)
-
-        if channel is SectionMarker:
+        if self.get_value(iter, self.C_IS_SECTION):
             section = self.get_value(iter, self.C_TITLE)
 
             # This row is a section header - update its visibility flags
-            channels = [c for c in (row[self.C_CHANNEL] for row in self)
-                    if isinstance(c, GPodcast) and c.section == section]
+            channels = self._channels_by_section.get(section, ())
 
             # Calculate the stats over all podcasts of this section
-            if len(channels) is 0:
-                total = deleted = new = downloaded = unplayed = 0
-            else:
-                total, deleted, new, downloaded, unplayed = list(map(sum,
-                        list(zip(*[c.get_statistics() for c in channels]))))
+            total, deleted, new, downloaded, unplayed = _aggregate_stats(
+                    self._stats(c) for c in channels)
 
             # We could customized the section header here with the list
             # of channels and their stats (i.e. add some "new" indicator)
-            description = '<span size="16000"> </span><b>%s</b>' % (
-                    html.escape(section))
-
-            self.set(
-                iter,
-                self.C_DESCRIPTION, description,
-                self.C_SECTION, section,
-                self.C_VIEW_SHOW_UNDELETED, total - deleted > 0,
-                self.C_VIEW_SHOW_DOWNLOADED, downloaded + new > 0,
-                self.C_VIEW_SHOW_UNPLAYED, unplayed + new > 0)
-
-        if (not isinstance(channel, GPodcast) and
-                not isinstance(channel, PodcastChannelProxy)):
+            description = self._section_desc_cache.get(section)
+            if description is None:
+                description = '<span size="16000"> </span><b>%s</b>' % (
+                        html.escape(section))
+                self._section_desc_cache[section] = description
+
+            self.set(iter, self._SECTION_COLS, [
+                description,
+                section,
+                total - deleted > 0,
+                downloaded + new > 0,
+                unplayed + new > 0,
+            ])
             return
 
-        total, deleted, new, downloaded, unplayed = channel.get_statistics()
-        description = self._format_description(channel, total, deleted, new,
-                downloaded, unplayed)
+        channel = self.get_value(iter, self.C_CHANNEL)
+        if not isinstance(channel, self._CHANNEL_TYPES):
+            return
+
+        if isinstance(channel, GPodcast):
+            self._set_channel_section(channel)
+
+        values = self._get_channel_values(channel)
+        if values is not None:
+            # One set() call for all columns emits a single "row-changed"
+            self.set(iter, self._CHANNEL_COLS, values)
+
+    def _get_channel_values(self, channel, force=False):
+        """Returns the values of _CHANNEL_COLS, or None if unchanged
+
+        With force=True, the values are always returned (for new rows).
+        """
+        # Podcast rows always get fresh statistics, section headers
+        # updated afterwards re-use them from the cache
+        total, deleted, new, downloaded, unplayed = self._stats(channel, refresh=True)
+
+        # Skip the update if nothing that is displayed has changed
+        sig = (total, deleted, new, downloaded, unplayed, channel.title,
+               channel.description, channel.section, channel.pause_subscription)
+        if not force and self._last_sig.get(channel.url) == sig:
+            return None
+        self._last_sig[channel.url] = sig
+
+        # The formatted markup only depends on some of the inputs
+        key = (channel.title, channel.description, bool(new),
+               channel.pause_subscription)
+        cached = self._fmt_cache.get(channel.url)
+        if cached is not None and cached[0] == key:
+            description, error_markup = cached[1:]
+        else:
+            description = self._format_description(channel, total, deleted,
+                    new, downloaded, unplayed)
+            error_markup = self._format_error(channel)
+            self._fmt_cache[channel.url] = (key, description, error_markup)
 
         pill_image = self._get_pill_image(channel, downloaded, unplayed)
 
-        self.set(iter,
-                self.C_TITLE, channel.title,
-                self.C_DESCRIPTION, description,
-                self.C_SECTION, channel.section,
-                self.C_ERROR, self._format_error(channel),
-                self.C_PILL, pill_image,
-                self.C_PILL_VISIBLE, pill_image is not None,
-                self.C_VIEW_SHOW_UNDELETED, total - deleted > 0,
-                self.C_VIEW_SHOW_DOWNLOADED, downloaded + new > 0,
-                self.C_VIEW_SHOW_UNPLAYED, unplayed + new > 0,
-                self.C_HAS_EPISODES, total > 0,
-                self.C_DOWNLOADS, downloaded)
+        # All searchable columns in one string, so that searching
+        # needs only a single substring test per row
+        haystack = '\n'.join(filter(None, (channel.title, description,
+                channel.section))).casefold()
+
+        return [
+            channel.title,
+            description,
+            channel.section,
+            error_markup,
+            pill_image,
+            pill_image is not None,
+            total - deleted > 0,
+            downloaded + new > 0,
+            unplayed + new > 0,
+            total > 0,
+            downloaded,
+            haystack,
+        ]
 
     def clear_cover_cache(self, podcast_url):
-        if podcast_url in self._cover_cache:
+        # Drops the cover at every size, with and without overlay
+        keys = [key for key in self._cover_cache if key[0] == podcast_url]
+        if keys:
             logger.info('Clearing cover from cache: %s', podcast_url)
-            del self._cover_cache[podcast_url]
+            for key in keys:
+                del self._cover_cache[key]
 
     def add_cover_by_channel(self, channel, pixbuf):
         if pixbuf is None:
@@ -903,10 +1384,10 @@ class PodcastListModel(Gtk.ListStore):
         self._save_cached_thumb(channel, pixbuf)
 
         if channel.pause_subscription:
-            pixbuf = self._overlay_pixbuf(pixbuf, self.ICON_DISABLED)
+            pixbuf = self._overlay_pixbuf(pixbuf.copy(), self.ICON_DISABLED)
             pixbuf.saturate_and_pixelate(pixbuf, 0.0, False)
+            self._cover_cache[self._overlay_key(channel.url)] = pixbuf
 
-        for row in self:
-            if row[self.C_URL] == channel.url:
-                row[self.C_COVER] = pixbuf
-                break
+        iter = self._get_iter_from_url(channel.url)
+        if iter is not None:
+            self.set_value(iter, self.C_COVER, pixbuf)